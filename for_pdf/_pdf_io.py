@@ -0,0 +1,42 @@
+"""
+File I/O helpers shared by pdf_devider.py and pdf_minimize.py.
+
+- Opens input PDFs with a large read buffer, or memory-maps large files.
+- Writes outputs through a temp file that is renamed into place on success.
+"""
+
+import mmap
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+# Inputs larger than this are memory-mapped instead of read through a file buffer
+MMAP_MIN_BYTES = 64 << 20
+
+
+def open_pdf_stream(path: str):
+    """Open path for PdfReader: memory-mapped when large, 1 MiB-buffered otherwise.
+
+    The caller owns the returned stream and must close it.
+    """
+    fh = open(path, "rb", buffering=1 << 20)
+    if os.path.getsize(path) <= MMAP_MIN_BYTES:
+        return fh
+    with fh:  # the mapping stays valid after the file is closed
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@contextmanager
+def atomic_write(path: str) -> Iterator[BinaryIO]:
+    """Write to a 1 MiB-buffered "<path>.tmp" and move it over path on success.
+
+    The temp file is removed if writing fails, so path is never left half-written.
+    """
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "wb", buffering=1 << 20) as fh:
+            yield fh
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -16,19 +16,43 @@ Usage examples:
 """
 
 import argparse
+import importlib.util
 import os
+import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Tuple
 
-# Lazy import with auto-install
+
+def _ensure_deps() -> None:
+    """Install PyPDF2 if it is missing. Only called when run as a script."""
+    if importlib.util.find_spec("PyPDF2") is None:
+        print("Installing PyPDF2...", file=sys.stderr)
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "PyPDF2"])  # noqa: S603,S607
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _ensure_deps()
+
+from PyPDF2 import PdfReader, PdfWriter  # noqa: E402
+
+# Package import (tests, `python -m`) or sibling import when run as a script
 try:
-    from PyPDF2 import PdfReader, PdfWriter
-except Exception:  # pragma: no cover
-    import subprocess
-    print("Installing PyPDF2...", file=sys.stderr)
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "PyPDF2"])  # noqa: S603,S607
-    from PyPDF2 import PdfReader, PdfWriter
+    from ._pdf_io import atomic_write, open_pdf_stream
+except ImportError:  # pragma: no cover
+    from _pdf_io import atomic_write, open_pdf_stream  # type: ignore[no-redef]
+
+# numpy's per-call overhead only pays off from roughly this many parts; below it
+# the plain loop in compute_chunks is as fast or faster. numpy is optional and only
+# imported once this threshold is reached, so ordinary runs skip its import cost.
+NUMPY_MIN_PARTS = 256
+
+# Optional fast path: pypdfium2 copies pages with PDFium's C serializer
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover
+    pdfium = None
 
 
 def compute_chunks(total_pages: int, n_parts: int) -> List[Tuple[int, int]]:
@@ -45,6 +69,19 @@ def compute_chunks(total_pages: int, n_parts: int) -> List[Tuple[int, int]]:
     base = total_pages // parts
     rem = total_pages % parts
 
+    np = None
+    if parts >= NUMPY_MIN_PARTS:
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover
+            pass
+    if np is not None:
+        sizes = np.full(parts, base, dtype=np.int64)
+        sizes[:rem] += 1
+        ends = np.cumsum(sizes) - 1
+        starts = ends - sizes + 1
+        return list(zip(starts.tolist(), ends.tolist()))
+
     ranges: List[Tuple[int, int]] = []
     start = 0
     for i in range(parts):
@@ -55,40 +92,130 @@ def compute_chunks(total_pages: int, n_parts: int) -> List[Tuple[int, int]]:
     return ranges
 
 
+def _write_pdfium_part(src, start: int, end: int, out_path: str) -> str:
+    """Copy pages start..end (0-based, inclusive) of pdfium document src into out_path."""
+    dst = pdfium.PdfDocument.new()
+    try:
+        dst.import_pages(src, list(range(start, end + 1)))
+        with atomic_write(out_path) as fh:
+            dst.save(fh)
+    finally:
+        dst.close()
+    return out_path
+
+
+def _write_reader_part(reader: PdfReader, start: int, end: int, out_path: str) -> str:
+    """Copy pages start..end (0-based, inclusive) of a PyPDF2 reader into out_path."""
+    writer = PdfWriter()
+    for p in range(start, end + 1):
+        writer.add_page(reader.pages[p])
+    with atomic_write(out_path) as fh:
+        writer.write(fh)
+    return out_path
+
+
+def _write_source_part(source, start: int, end: int, out_path: str) -> str:
+    """Copy a page range from a pdfium document (when pypdfium2 is installed) or a PyPDF2 reader."""
+    if pdfium is not None:
+        return _write_pdfium_part(source, start, end, out_path)
+    return _write_reader_part(source, start, end, out_path)
+
+
+# Per-process source document used by _write_part; set by _init_part_worker
+_worker_source = None
+
+
+def _init_part_worker(input_path: str) -> None:
+    """Open the input PDF once per worker process."""
+    global _worker_source
+    if pdfium is not None:
+        _worker_source = pdfium.PdfDocument(input_path)
+    else:
+        _worker_source = PdfReader(open_pdf_stream(input_path))  # stream lives as long as the worker
+
+
+def _write_part(start: int, end: int, out_path: str) -> str:
+    """Pool task: write pages start..end (0-based, inclusive) of the worker's document into out_path."""
+    return _write_source_part(_worker_source, start, end, out_path)
+
+
+def _is_case_insensitive_dir(directory: Path, entry_names: List[str]) -> bool:
+    """Return True if directory ignores filename case (macOS/Windows defaults).
+
+    Probes one existing entry under its case-swapped name, so it costs at most one stat().
+    """
+    probe = next((name for name in entry_names if name.swapcase() != name), None)
+    if probe is None:
+        return False
+    swapped = directory / probe.swapcase()
+    return swapped.exists() and os.path.samefile(directory / probe, swapped)
+
+
+def _existing_names(directory: Path, names: List[str]) -> List[str]:
+    """Return the entries of names that already exist in directory.
+
+    Uses one directory listing instead of a stat() per name, comparing
+    case-folded names when the filesystem is case-insensitive.
+    """
+    with os.scandir(directory) as entries:
+        entry_names = [e.name for e in entries]
+    if _is_case_insensitive_dir(directory, entry_names):
+        folded = {name.casefold() for name in entry_names}
+        return [name for name in names if name.casefold() in folded]
+    existing = set(entry_names)
+    return [name for name in names if name in existing]
+
+
 def split_pdf(input_path: str, n_parts: int, output_dir: str | None = None,
               output_prefix: str | None = None, overwrite: bool = False) -> list[str]:
     """Split the PDF at input_path into n_parts and write files to output_dir.
 
+    Parts are written in parallel worker processes when more than one CPU and
+    part are available, otherwise serially from a single reader.
+
     Returns list of written file paths.
     """
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
-    reader = PdfReader(input_path)
-    total = len(reader.pages)
-    if total == 0:
-        raise ValueError("Input PDF has no pages")
-
-    ranges = compute_chunks(total, n_parts)
-
-    in_path = Path(input_path)
-    out_dir = Path(output_dir) if output_dir else in_path.parent
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    base_name = output_prefix if output_prefix else in_path.stem
-
-    written: list[str] = []
-    for idx, (start, end) in enumerate(ranges, start=1):
-        writer = PdfWriter()
-        for p in range(start, end + 1):
-            writer.add_page(reader.pages[p])
-        out_name = f"{base_name}_part_{idx}of{len(ranges)}.pdf"
-        out_path = out_dir / out_name
-        if out_path.exists() and not overwrite:
-            raise FileExistsError(f"Output exists: {out_path} (use --overwrite to replace)")
-        with open(out_path, 'wb') as fh:
-            writer.write(fh)
-        written.append(str(out_path))
+    with open_pdf_stream(input_path) as stream:
+        reader = PdfReader(stream)
+        total = len(reader.pages)
+        if total == 0:
+            raise ValueError("Input PDF has no pages")
+
+        ranges = compute_chunks(total, n_parts)
+
+        in_path = Path(input_path)
+        out_dir = Path(output_dir) if output_dir else in_path.parent
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        base_name = output_prefix if output_prefix else in_path.stem
+
+        out_names = [f"{base_name}_part_{idx}of{len(ranges)}.pdf" for idx in range(1, len(ranges) + 1)]
+        if not overwrite:
+            # Fail before writing anything, naming every conflicting output
+            conflicts = [str(out_dir / name) for name in _existing_names(out_dir, out_names)]
+            if conflicts:
+                raise FileExistsError(f"Output exists: {', '.join(conflicts)} (use --overwrite to replace)")
+        out_paths = [str(out_dir / name) for name in out_names]
+
+        max_workers = min(len(ranges), os.cpu_count() or 1)
+        if max_workers == 1:
+            # Reuse the reader opened above instead of starting a process pool
+            source = pdfium.PdfDocument(input_path) if pdfium is not None else reader
+            try:
+                return [_write_source_part(source, start, end, out_path)
+                        for (start, end), out_path in zip(ranges, out_paths)]
+            finally:
+                if pdfium is not None:
+                    source.close()
+
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_part_worker,
+                             initargs=(input_path,)) as executor:
+        written = list(executor.map(_write_part, starts, ends, out_paths))
     return written
 
 
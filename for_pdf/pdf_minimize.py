@@ -17,40 +17,86 @@ Install on macOS: brew install ghostscript
 """
 
 import argparse
+import bisect
+import ctypes.util
+import functools
+import hashlib
+import importlib.util
 import io
 import os
 import shutil
 import subprocess
 import sys
-from typing import Optional, Set
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 
-# Lazy import of third-party libs with auto-install fallback
+
+def _ensure_deps() -> None:
+    """Install PyPDF2 and Pillow if they are missing. Only called when run as a script."""
+    missing = [pkg for pkg, module in (("PyPDF2", "PyPDF2"), ("Pillow", "PIL"))
+               if importlib.util.find_spec(module) is None]
+    if missing:
+        print(f"Required packages not found. Installing {' and '.join(missing)}...", file=sys.stderr)
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])  # noqa: S603,S607
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _ensure_deps()
+
+from PyPDF2 import PdfReader, PdfWriter  # noqa: E402
+from PyPDF2.generic import IndirectObject, NameObject  # noqa: E402
+from PIL import Image  # noqa: E402
+
+# Package import (tests, `python -m`) or sibling import when run as a script
 try:
-    from PyPDF2 import PdfReader, PdfWriter
-    from PyPDF2.generic import IndirectObject
-    from PIL import Image
-except Exception:  # pragma: no cover
-    print("Required packages not found. Installing PyPDF2 and Pillow...", file=sys.stderr)
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "PyPDF2", "Pillow"])  # noqa: S603,S607
-    from PyPDF2 import PdfReader, PdfWriter
-    from PyPDF2.generic import IndirectObject
-    from PIL import Image
+    from ._pdf_io import atomic_write, open_pdf_stream
+except ImportError:  # pragma: no cover
+    from _pdf_io import atomic_write, open_pdf_stream  # type: ignore[no-redef]
+
+# Images smaller than this are returned as-is by compress_image: the JPEG
+# round-trip costs more than it saves and often grows the stream.
+MIN_RECOMPRESS_PIXELS = 64 * 64
+MIN_RECOMPRESS_BYTES = 2048
+
+
+# Ghostscript presets by reduction percent: <=20, <=40, <=60, above
+GS_SETTINGS_THRESHOLDS = (20, 40, 60)
+GS_SETTINGS = (
+    {"setting": "/prepress", "resolution": 300, "desc": "High quality (prepress)"},
+    {"setting": "/printer", "resolution": 300, "desc": "Good quality (printer)"},
+    {"setting": "/ebook", "resolution": 150, "desc": "Medium quality (ebook)"},
+    {"setting": "/screen", "resolution": 72, "desc": "Lower quality (screen)"},
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_turbo():
+    """Return a TurboJPEG encoder (libjpeg-turbo SIMD DCT/Huffman), or None if unavailable.
 
+    Resolved on first use. The shared library is located before importing turbojpeg,
+    because that module loads numpy at import time.
+    """
+    if importlib.util.find_spec("turbojpeg") is None:
+        return None
+    lib_path = ctypes.util.find_library("turbojpeg")
+    if lib_path is None:
+        return None
+    try:
+        from turbojpeg import TurboJPEG
+        return TurboJPEG(lib_path)
+    except (ImportError, OSError, RuntimeError):  # pragma: no cover - broken install
+        return None
 
+
+@functools.lru_cache(maxsize=1)
 def check_ghostscript() -> bool:
-    """Return True if Ghostscript binary is available in PATH."""
+    """Return True if Ghostscript binary is available in PATH (looked up once per process)."""
     return shutil.which("gs") is not None
 
 
 def get_ghostscript_settings(reduction_percent: int) -> dict:
     """Map desired reduction to Ghostscript preset and resolution."""
-    if reduction_percent <= 20:
-        return {"setting": "/prepress", "resolution": 300, "desc": "High quality (prepress)"}
-    if reduction_percent <= 40:
-        return {"setting": "/printer", "resolution": 300, "desc": "Good quality (printer)"}
-    if reduction_percent <= 60:
-        return {"setting": "/ebook", "resolution": 150, "desc": "Medium quality (ebook)"}
-    return {"setting": "/screen", "resolution": 72, "desc": "Lower quality (screen)"}
+    return dict(GS_SETTINGS[bisect.bisect_left(GS_SETTINGS_THRESHOLDS, reduction_percent)])
 
 
 def calculate_target_quality(reduction_percent: int) -> int:
@@ -90,9 +136,21 @@ def parse_page_ranges(pages: Optional[str]) -> Optional[Set[int]]:
 
 
 def compress_image(image_data: bytes, quality: int) -> bytes:
-    """Compress image bytes using Pillow JPEG encoder."""
+    """Compress image bytes to JPEG.
+
+    Pillow decodes and normalizes the image; encoding uses libjpeg-turbo when
+    PyTurboJPEG is available, otherwise Pillow's JPEG encoder.
+    """
+    if len(image_data) < MIN_RECOMPRESS_BYTES:
+        return image_data
+    # Re-encoding an existing JPEG at high quality rarely shrinks it
+    if quality >= 85 and image_data[:3] == b"\xff\xd8\xff":
+        return image_data
     try:
         img = Image.open(io.BytesIO(image_data))
+        # Size and mode are known from the header; skip tiny images and 1-bit masks
+        if img.width * img.height < MIN_RECOMPRESS_PIXELS or img.mode == "1":
+            return image_data
         img.load()  # ensure data is read
         # Convert to RGB, remove alpha by placing on white background
         if img.mode in ("RGBA", "LA"):
@@ -104,8 +162,17 @@ def compress_image(image_data: bytes, quality: int) -> bytes:
             img = img.convert("RGB")
         elif img.mode != "RGB":
             img = img.convert("RGB")
+        turbo = _get_turbo()
+        if turbo is not None:
+            import numpy as np
+            from turbojpeg import TJFLAG_PROGRESSIVE, TJPF_RGB, TJSAMP_420
+            arr = np.ascontiguousarray(np.asarray(img))
+            return turbo.encode(arr, quality=quality, pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420,
+                                 flags=TJFLAG_PROGRESSIVE)
         out = io.BytesIO()
-        img.save(out, format="JPEG", quality=quality, optimize=True)  # type: ignore[arg-type]
+        # Progressive + optimal Huffman tables: smaller output at the same quality
+        img.save(out, format="JPEG", quality=quality, optimize=True, progressive=True,  # type: ignore[arg-type]
+                 subsampling="4:2:0")
         return out.getvalue()
     except Exception as e:  # fallback to original on errors
         print(f"Warning: image compression failed ({e}). Keeping original.", file=sys.stderr)
@@ -119,54 +186,153 @@ def _get_obj(obj):
     return obj
 
 
+# Per-process state used by _compress_page_images; set by _init_page_worker
+_worker_reader = None
+# BLAKE2b digest of original image bytes -> compressed bytes. Dedups repeated images
+# (logos, backgrounds) only among the pages handled by this worker process; the same
+# image on pages that land on different workers is encoded once in each of them.
+_worker_cache: Dict[bytes, bytes] = {}
+# Encode threads for pages with several images; None when the worker gets one thread
+_worker_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _init_page_worker(input_path: str, threads: int) -> None:
+    """Open the input PDF once per worker process, reset the image cache and start its encode threads."""
+    global _worker_reader, _worker_pool
+    _worker_reader = PdfReader(open_pdf_stream(input_path))  # stream lives as long as the worker
+    _worker_cache.clear()
+    _worker_pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+
+
+def _compress_reader_page(reader: PdfReader, idx: int, quality: int, recompress_jpeg: bool,
+                          cache: Dict[bytes, bytes],
+                          pool: Optional[ThreadPoolExecutor] = None) -> List[Tuple[str, bytes, str]]:
+    """Compress images on 1-indexed page idx of reader without modifying it.
+
+    cache maps BLAKE2b digests of original image bytes to compressed bytes. If pool
+    is given, several uncached images on the page are encoded on its threads.
+    Returns [(xobject_name, new_data, new_filter), ...] for images that got smaller.
+    """
+    replacements: List[Tuple[str, bytes, str]] = []
+    try:
+        page = reader.pages[idx - 1]
+        resources = _get_obj(page.get("/Resources"))
+        if not (resources and "/XObject" in resources):
+            return replacements
+        xobjects = _get_obj(resources["/XObject"])  # dict of image/xobj
+
+        # (name, original data, cache key) for every image to recompress
+        images: List[Tuple[str, bytes, bytes]] = []
+        # Read-only walk here (replacements are applied in the main process)
+        for name, ref in xobjects.items():
+            xobj = _get_obj(ref)
+            if xobj.get("/Subtype") == "/Image":
+                filt = xobj.get("/Filter")
+                # Skip already-JPEG images unless forced recompress
+                if (filt == "/DCTDecode") and not recompress_jpeg:
+                    continue
+                data = xobj.get_data()
+                images.append((name, data, hashlib.blake2b(data, digest_size=16).digest()))
+
+        misses = {key: data for _, data, key in images if key not in cache}
+        if pool is not None and len(misses) > 1:
+            # Pillow releases the GIL while encoding, so threads overlap the work
+            encoded = list(pool.map(lambda d: compress_image(d, quality), misses.values()))
+        else:
+            encoded = [compress_image(d, quality) for d in misses.values()]
+        cache.update(zip(misses.keys(), encoded))
+
+        for name, data, key in images:
+            new_data = cache[key]
+            if len(new_data) < len(data):
+                replacements.append((name, new_data, "/DCTDecode"))
+    except Exception as e:
+        print(f"Warning: page {idx} compression skipped due to error: {e}", file=sys.stderr)
+        return []
+    return replacements
+
+
+def _compress_page_images(idx: int, quality: int,
+                          recompress_jpeg: bool) -> Tuple[int, List[Tuple[str, bytes, str]]]:
+    """Pool task: compress images on page idx of the worker's reader, returning (idx, replacements)."""
+    return idx, _compress_reader_page(_worker_reader, idx, quality, recompress_jpeg,  # type: ignore[arg-type]
+                                      _worker_cache, _worker_pool)
+
+
 def reduce_pdf_with_pypdf(input_path: str, output_path: str, reduction_percent: int, pages: Optional[Set[int]] = None,
                            recompress_jpeg: bool = False) -> None:
     """Compress images on selected pages using PyPDF2 and save to output_path.
 
     If recompress_jpeg is True, also recompress images already encoded with DCT (JPEG),
     which can increase reduction at the cost of quality.
-    """
-    reader = PdfReader(input_path)
-    writer = PdfWriter()
 
-    total_pages = len(reader.pages)
-    quality = calculate_target_quality(reduction_percent)
+    Pages are compressed in parallel worker processes when more than one CPU and
+    page are involved; the results are merged back into a single writer in the
+    main process.
+    """
+    with open_pdf_stream(input_path) as stream:
+        reader = PdfReader(stream)
+        writer = PdfWriter()
 
-    compressed_pages = 0
-    skipped_pages = 0
+        # Resolve the page tree once up front
+        page_list = list(reader.pages)
+        total_pages = len(page_list)
+        quality = calculate_target_quality(reduction_percent)
 
-    for idx, page in enumerate(reader.pages, start=1):
-        should_compress = (pages is None) or (idx in pages)
-        if should_compress:
-            compressed_pages += 1
+        if pages is None:
+            selected = list(range(1, total_pages + 1))
+        else:
+            # Walk the requested set once instead of probing it for every page
+            selected = sorted(idx for idx in pages if 1 <= idx <= total_pages)
+        compressed_pages = len(selected)
+        skipped_pages = total_pages - compressed_pages
+
+        results: dict = {}
+        cpus = os.cpu_count() or 1
+        max_workers = min(len(selected), cpus)
+        # Split the CPUs between processes and encode threads: threads only help
+        # when fewer pages than cores are selected
+        threads = max(1, cpus // max_workers) if max_workers else 1
+        if max_workers == 1:
+            # A process pool would only add process startup, a second parse and pickling
+            cache: Dict[bytes, bytes] = {}
+            pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
             try:
-                resources = _get_obj(page.get("/Resources"))
-                if resources and "/XObject" in resources:
-                    xobjects = _get_obj(resources["/XObject"])  # dict of image/xobj
-                    for name in list(xobjects.keys()):
+                for idx in selected:
+                    results[idx] = _compress_reader_page(reader, idx, quality, recompress_jpeg, cache, pool)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+        elif max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_page_worker,
+                                     initargs=(input_path, threads)) as executor:
+                futures = [executor.submit(_compress_page_images, idx, quality, recompress_jpeg) for idx in selected]
+                for future in futures:
+                    idx, replacements = future.result()
+                    results[idx] = replacements
+
+        for idx, page in enumerate(page_list, start=1):
+            replacements = results.get(idx)
+            if replacements:
+                try:
+                    xobjects = _get_obj(_get_obj(page["/Resources"])["/XObject"])
+                    for name, new_data, new_filter in replacements:
                         xobj = _get_obj(xobjects[name])
-                        if xobj.get("/Subtype") == "/Image":
-                            filt = xobj.get("/Filter")
-                            # Skip already-JPEG images unless forced recompress
-                            if (filt == "/DCTDecode") and not recompress_jpeg:
-                                continue
-                            data = xobj.get_data()
-                            new_data = compress_image(data, quality)
-                            if len(new_data) < len(data):
-                                # Replace stream data and mark as JPEG
-                                xobj._data = new_data  # type: ignore[attr-defined]
-                                xobj["/Filter"] = "/DCTDecode"
-                                # Remove color space inconsistencies for JPEG
-                                if "/ColorSpace" in xobj and xobj["/ColorSpace"] == "/DeviceCMYK":
-                                    del xobj["/ColorSpace"]
-            except Exception as e:
-                print(f"Warning: page {idx} compression skipped due to error: {e}", file=sys.stderr)
-        else:
-            skipped_pages += 1
-        writer.add_page(page)
-
-    with open(output_path, "wb") as f:
-        writer.write(f)
+                        # Replace stream data and mark as JPEG
+                        xobj._data = new_data  # type: ignore[attr-defined]
+                        xobj[NameObject("/Filter")] = NameObject(new_filter)
+                        # Predictor params of the old filter do not apply to JPEG data
+                        if "/DecodeParms" in xobj:
+                            del xobj["/DecodeParms"]
+                        # Remove color space inconsistencies for JPEG
+                        if "/ColorSpace" in xobj and xobj["/ColorSpace"] == "/DeviceCMYK":
+                            del xobj["/ColorSpace"]
+                except Exception as e:
+                    print(f"Warning: page {idx} compression skipped due to error: {e}", file=sys.stderr)
+            writer.add_page(page)
+
+        with atomic_write(output_path) as f:
+            writer.write(f)
 
     print(f"PyPDF2: compressed pages={compressed_pages}, kept original pages={skipped_pages}")
 
@@ -196,6 +362,7 @@ def reduce_pdf_with_ghostscript(input_path: str, output_path: str, reduction_per
         "-dNOPAUSE",
         "-dQUIET",
         "-dBATCH",
+        f"-dNumRenderingThreads={os.cpu_count() or 2}",
         f"-r{dpi}",
         # Fonts
         "-dCompressFonts=true",
@@ -223,18 +390,24 @@ def reduce_pdf_with_ghostscript(input_path: str, output_path: str, reduction_per
         jq = max(1, min(95, int(gs_jpegq)))
         cmd.append(f"-dJPEGQ={jq}")
 
+    # Write next to the target and rename on success, so a failed run leaves no partial output
+    tmp_path = f"{output_path}.tmp"
     cmd += [
-        f"-sOutputFile={output_path}",
+        f"-sOutputFile={tmp_path}",
         input_path,
     ]
 
     try:
         subprocess.run(cmd, check=True, capture_output=True)  # noqa: S603
+        os.replace(tmp_path, output_path)
         print(f"Ghostscript: preset={preset}, dpi={dpi}, jpegq={gs_jpegq if gs_jpegq is not None else 'default'}")
         return True
     except Exception as e:
         print(f"Ghostscript failed: {e}", file=sys.stderr)
         return False
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 def reduce_pdf_size(input_path: str, output_path: str, reduction_percent: int, method: str = "auto",
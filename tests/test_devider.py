@@ -1,8 +1,13 @@
+import mmap
 import os
+import subprocess
+import sys
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
+from for_pdf import _pdf_io, pdf_devider
 from for_pdf.pdf_devider import compute_chunks, split_pdf
 from PyPDF2 import PdfWriter, PdfReader
 
@@ -15,7 +20,7 @@ def make_pdf(path: Path, pages: int = 7) -> None:
             writer.add_blank_page(width=595, height=842)  # A4-ish points
         else:
             writer.add_blank_page()
-    with open(path, "wb") as f:
+    with open(path, "wb", buffering=1 << 20) as f:
         writer.write(f)
 
 
@@ -31,6 +36,23 @@ def test_compute_chunks_distribution():
     assert sizes == [1, 1, 1, 1, 1]
 
 
+def test_compute_chunks_many_parts():
+    # 1000 pages into 300 parts -> 100 parts of 4 pages, then 200 of 3, contiguous
+    ranges = compute_chunks(1000, 300)
+    assert len(ranges) == 300
+    sizes = [end - start + 1 for start, end in ranges]
+    assert sizes == [4] * 100 + [3] * 200
+    assert ranges[0][0] == 0 and ranges[-1][1] == 999
+    assert all(prev[1] + 1 == cur[0] for prev, cur in zip(ranges, ranges[1:]))
+    assert all(isinstance(i, int) for r in ranges for i in r)
+
+
+def test_import_does_not_load_numpy():
+    code = "import sys, for_pdf.pdf_devider; sys.exit('numpy' in sys.modules)"
+    root = Path(__file__).resolve().parent.parent
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
+
+
 @pytest.mark.parametrize("pages,n_parts", [(10, 3), (9, 2), (5, 10)])
 def test_split_pdf_creates_parts(tmp_path: Path, pages: int, n_parts: int):
     src = tmp_path / "src.pdf"
@@ -55,6 +77,94 @@ def test_split_pdf_creates_parts(tmp_path: Path, pages: int, n_parts: int):
     assert (max(counts) - min(counts)) <= 1
 
 
+@pytest.mark.parametrize("backend", ["pypdf2", "pypdfium2"])
+def test_write_part_backends(tmp_path: Path, monkeypatch, backend: str):
+    if backend == "pypdfium2":
+        monkeypatch.setattr(pdf_devider, "pdfium", pytest.importorskip("pypdfium2"))
+    else:
+        monkeypatch.setattr(pdf_devider, "pdfium", None)
+    monkeypatch.setattr(pdf_devider, "_worker_source", None)
+    src = tmp_path / "src.pdf"
+    make_pdf(src, pages=6)
+
+    pdf_devider._init_part_worker(str(src))
+    for start, end in [(0, 1), (2, 4)]:
+        out = tmp_path / f"part_{start}.pdf"
+        assert pdf_devider._write_part(start, end, str(out)) == str(out)
+        assert len(PdfReader(str(out)).pages) == end - start + 1
+        assert not (tmp_path / f"part_{start}.pdf.tmp").exists()
+
+
+@pytest.mark.parametrize("backend", ["pypdf2", "pypdfium2"])
+def test_split_pdf_multiple_workers(tmp_path: Path, monkeypatch, backend: str):
+    if backend == "pypdfium2":
+        monkeypatch.setattr(pdf_devider, "pdfium", pytest.importorskip("pypdfium2"))
+    else:
+        monkeypatch.setattr(pdf_devider, "pdfium", None)
+    monkeypatch.setattr(pdf_devider.os, "cpu_count", lambda: 4)
+    src = tmp_path / "src.pdf"
+    make_pdf(src, pages=10)
+
+    written = split_pdf(str(src), 3, output_dir=str(tmp_path / "out"))
+    assert [len(PdfReader(p).pages) for p in written] == [4, 3, 3]
+
+
+@pytest.mark.parametrize("cpus", [1, 4])
+def test_split_pdf_memory_mapped_input(tmp_path: Path, monkeypatch, cpus: int):
+    monkeypatch.setattr(_pdf_io, "MMAP_MIN_BYTES", 0)
+    mapped = []
+
+    def spy_mmap(*args, **kwargs):
+        mapped.append(args)
+        return mmap.mmap(*args, **kwargs)
+
+    monkeypatch.setattr(_pdf_io, "mmap", SimpleNamespace(mmap=spy_mmap, ACCESS_READ=mmap.ACCESS_READ))
+    monkeypatch.setattr(pdf_devider, "pdfium", None)
+    monkeypatch.setattr(pdf_devider.os, "cpu_count", lambda: cpus)
+    src = tmp_path / "src.pdf"
+    make_pdf(src, pages=5)
+
+    written = split_pdf(str(src), 2, output_dir=str(tmp_path / "out"))
+    assert [len(PdfReader(p).pages) for p in written] == [3, 2]
+    assert mapped
+
+
+def test_split_pdf_single_cpu_writes_serially(tmp_path: Path, monkeypatch):
+    src = tmp_path / "src.pdf"
+    make_pdf(src, pages=7)
+    monkeypatch.setattr(pdf_devider.os, "cpu_count", lambda: 1)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool used with a single CPU")
+
+    monkeypatch.setattr(pdf_devider, "ProcessPoolExecutor", no_pool)
+
+    written = split_pdf(str(src), 3, output_dir=str(tmp_path / "out"))
+    assert [len(PdfReader(p).pages) for p in written] == [3, 2, 2]
+
+
+def test_split_pdf_failed_write_leaves_no_partial_output(tmp_path: Path, monkeypatch):
+    src = tmp_path / "src.pdf"
+    make_pdf(src, pages=2)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    existing = out_dir / "src_part_1of1.pdf"
+    existing.write_bytes(b"previous output")
+    monkeypatch.setattr(pdf_devider, "pdfium", None)
+    monkeypatch.setattr(pdf_devider.os, "cpu_count", lambda: 1)
+
+    def broken_write(self, stream):
+        stream.write(b"%PDF-partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(PdfWriter, "write", broken_write)
+
+    with pytest.raises(OSError, match="disk full"):
+        split_pdf(str(src), 1, output_dir=str(out_dir), overwrite=True)
+    assert existing.read_bytes() == b"previous output"
+    assert sorted(p.name for p in out_dir.iterdir()) == ["src_part_1of1.pdf"]
+
+
 def test_split_overwrite_flag(tmp_path: Path):
     src = tmp_path / "src.pdf"
     make_pdf(src, pages=3)
@@ -65,3 +175,38 @@ def test_split_overwrite_flag(tmp_path: Path):
     with pytest.raises(FileExistsError):
         split_pdf(str(src), 2, output_dir=str(out_dir), overwrite=False)
 
+    # only part 2 exists: nothing is written and the conflict is named
+    fresh_dir = tmp_path / "fresh"
+    fresh_dir.mkdir()
+    (fresh_dir / "src_part_2of2.pdf").write_bytes(b"keep")
+    with pytest.raises(FileExistsError, match="src_part_2of2.pdf") as excinfo:
+        split_pdf(str(src), 2, output_dir=str(fresh_dir), overwrite=False)
+    assert "src_part_1of2.pdf" not in str(excinfo.value)
+    assert not (fresh_dir / "src_part_1of2.pdf").exists()
+    assert (fresh_dir / "src_part_2of2.pdf").read_bytes() == b"keep"
+
+
+@pytest.mark.parametrize("case_insensitive", [False, True])
+def test_split_overwrite_check_follows_filesystem_case(tmp_path: Path, monkeypatch, case_insensitive: bool):
+    src = tmp_path / "src.pdf"
+    make_pdf(src, pages=3)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    (out_dir / "SRC_part_1of2.pdf").write_bytes(b"keep")
+    monkeypatch.setattr(pdf_devider, "_is_case_insensitive_dir", lambda directory, names: case_insensitive)
+
+    if case_insensitive:
+        with pytest.raises(FileExistsError, match="src_part_1of2.pdf"):
+            split_pdf(str(src), 2, output_dir=str(out_dir), overwrite=False)
+        assert not (out_dir / "src_part_2of2.pdf").exists()
+    else:
+        written = split_pdf(str(src), 2, output_dir=str(out_dir), overwrite=False)
+        assert len(written) == 2
+    assert (out_dir / "SRC_part_1of2.pdf").read_bytes() == b"keep"
+
+
+def test_is_case_insensitive_dir_probe(tmp_path: Path):
+    (tmp_path / "Probe.txt").write_bytes(b"")
+    expected = (tmp_path / "pROBE.TXT").exists()
+    assert pdf_devider._is_case_insensitive_dir(tmp_path, ["Probe.txt"]) is expected
+    assert pdf_devider._is_case_insensitive_dir(tmp_path, ["123"]) is False
@@ -1,12 +1,21 @@
 from pathlib import Path
 
+import ctypes.util
+import io
+import mmap
 import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 
 import pytest
 from PIL import Image
-from PyPDF2 import PdfReader
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DictionaryObject, NameObject, NumberObject
 
-from for_pdf.pdf_minimize import parse_page_ranges, reduce_pdf_size
+from for_pdf import _pdf_io, pdf_minimize
+from for_pdf.pdf_minimize import compress_image, get_ghostscript_settings, parse_page_ranges, reduce_pdf_size
 
 
 def make_image_pdf(path: Path, pages: int = 3, size=(1200, 1200)) -> None:
@@ -17,7 +26,8 @@ def make_image_pdf(path: Path, pages: int = 3, size=(1200, 1200)) -> None:
         imgs.append(img)
     # Save multi-page PDF using Pillow
     first, *rest = imgs
-    first.save(path, format="PDF", save_all=True, append_images=rest)
+    with open(path, "wb", buffering=1 << 20) as f:
+        first.save(f, format="PDF", save_all=True, append_images=rest)
 
 
 def test_parse_page_ranges():
@@ -27,6 +37,74 @@ def test_parse_page_ranges():
         parse_page_ranges("0")
     with pytest.raises(ValueError):
         parse_page_ranges("3-2")
+    assert parse_page_ranges("1,,3,") == {1, 3}
+    with pytest.raises(ValueError, match="Invalid page number: x"):
+        parse_page_ranges("1,x,9")
+    with pytest.raises(ValueError, match="Invalid page range: 3-"):
+        parse_page_ranges("3-")
+
+
+@pytest.mark.parametrize("percent,preset", [
+    (0, "/prepress"), (20, "/prepress"), (21, "/printer"), (40, "/printer"),
+    (41, "/ebook"), (60, "/ebook"), (61, "/screen"), (100, "/screen"),
+])
+def test_get_ghostscript_settings_boundaries(percent: int, preset: str):
+    assert get_ghostscript_settings(percent)["setting"] == preset
+
+
+def test_compress_image_keeps_tiny_images_and_masks():
+    tiny = io.BytesIO()
+    Image.effect_noise((32, 32), 100.0).convert("RGB").save(tiny, format="PNG")
+    assert compress_image(tiny.getvalue(), 50) == tiny.getvalue()
+
+    mask = io.BytesIO()
+    Image.effect_noise((400, 400), 100.0).convert("1").save(mask, format="PNG")
+    assert compress_image(mask.getvalue(), 50) == mask.getvalue()
+
+
+def test_compress_image_uses_turbojpeg_when_available(monkeypatch):
+    turbojpeg = pytest.importorskip("turbojpeg")
+    pytest.importorskip("numpy")
+    calls = []
+
+    class StubTurbo:
+        def encode(self, arr, **kwargs):
+            calls.append((arr.shape, kwargs))
+            return b"turbo"
+
+    monkeypatch.setattr(pdf_minimize, "_get_turbo", lambda: StubTurbo())
+    png = io.BytesIO()
+    Image.effect_noise((120, 80), 100.0).convert("RGB").save(png, format="PNG")
+
+    assert compress_image(png.getvalue(), 40) == b"turbo"
+    assert calls == [((80, 120, 3), {
+        "quality": 40,
+        "pixel_format": turbojpeg.TJPF_RGB,
+        "jpeg_subsample": turbojpeg.TJSAMP_420,
+        "flags": turbojpeg.TJFLAG_PROGRESSIVE,
+    })]
+
+
+@pytest.mark.skipif(ctypes.util.find_library("turbojpeg") is not None, reason="libjpeg-turbo installed")
+def test_compress_image_without_libjpeg_turbo_does_not_load_numpy():
+    code = (
+        "import io, sys\n"
+        "from PIL import Image\n"
+        "from for_pdf.pdf_minimize import compress_image\n"
+        "png = io.BytesIO()\n"
+        "Image.effect_noise((120, 80), 100.0).convert('RGB').save(png, format='PNG')\n"
+        "compress_image(png.getvalue(), 40)\n"
+        "sys.exit('numpy' in sys.modules)\n"
+    )
+    root = Path(__file__).resolve().parent.parent
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
+
+
+def test_compress_image_keeps_jpeg_at_high_quality():
+    jpeg = io.BytesIO()
+    Image.effect_noise((400, 400), 100.0).convert("RGB").save(jpeg, format="JPEG", quality=90)
+    assert compress_image(jpeg.getvalue(), 90) == jpeg.getvalue()
+    assert compress_image(jpeg.getvalue(), 40) != jpeg.getvalue()
 
 
 @pytest.mark.parametrize("method", ["pypdf2"])  # ghostscript not required in CI
@@ -46,6 +124,157 @@ def test_reduce_pdf_size_runs_and_preserves_pages(tmp_path: Path, method: str):
     assert os.path.getsize(dst) <= os.path.getsize(src)
 
 
+def test_reduce_pdf_size_rewrites_image_filter(tmp_path: Path):
+    src = tmp_path / "src_images.pdf"
+    dst = tmp_path / "dst.pdf"
+    plain = tmp_path / "plain.pdf"
+    make_image_pdf(plain, pages=2, size=(600, 600))
+
+    # Wrap the filter in an array and add decode params so the image is not
+    # skipped as plain /DCTDecode and the rewrite has to replace both
+    reader = PdfReader(str(plain))
+    writer = PdfWriter()
+    original_sizes = []
+    for page in reader.pages:
+        for ref in page["/Resources"]["/XObject"].values():
+            xobj = ref.get_object()
+            xobj[NameObject("/Filter")] = ArrayObject([NameObject("/DCTDecode")])
+            xobj[NameObject("/DecodeParms")] = DictionaryObject({NameObject("/ColorTransform"): NumberObject(1)})
+            original_sizes.append(len(xobj.get_data()))
+        writer.add_page(page)
+    with open(src, "wb") as f:
+        writer.write(f)
+
+    reduce_pdf_size(str(src), str(dst), reduction_percent=60, method="pypdf2")
+
+    new_sizes = []
+    for page in PdfReader(str(dst)).pages:
+        for ref in page["/Resources"]["/XObject"].values():
+            xobj = ref.get_object()
+            assert xobj["/Filter"] == "/DCTDecode"
+            assert "/DecodeParms" not in xobj
+            new_sizes.append(len(xobj.get_data()))
+    assert len(new_sizes) == len(original_sizes) == 2
+    assert all(new < old for new, old in zip(new_sizes, original_sizes))
+
+
+def test_reduce_pdf_size_single_cpu_runs_in_process(tmp_path: Path, monkeypatch):
+    src = tmp_path / "src_images.pdf"
+    dst = tmp_path / "dst.pdf"
+    make_image_pdf(src, pages=3, size=(600, 600))
+    monkeypatch.setattr(pdf_minimize.os, "cpu_count", lambda: 1)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool used with a single CPU")
+
+    monkeypatch.setattr(pdf_minimize, "ProcessPoolExecutor", no_pool)
+
+    reduce_pdf_size(str(src), str(dst), reduction_percent=60, method="pypdf2", recompress_jpeg=True)
+    assert len(PdfReader(str(dst)).pages) == 3
+    assert os.path.getsize(dst) < os.path.getsize(src)
+
+
+def test_compress_reader_page_threads_multiple_images(tmp_path: Path):
+    plain = tmp_path / "plain.pdf"
+    src = tmp_path / "two_images.pdf"
+    make_image_pdf(plain, pages=2, size=(300, 300))
+
+    # Move page 2's image onto page 1 so one page holds two distinct images
+    reader = PdfReader(str(plain))
+    first, second = reader.pages
+    (name, ref), = second["/Resources"]["/XObject"].items()
+    first["/Resources"]["/XObject"][NameObject(name + "b")] = ref
+    writer = PdfWriter()
+    writer.add_page(first)
+    with open(src, "wb") as f:
+        writer.write(f)
+
+    reader = PdfReader(str(src))
+    serial = pdf_minimize._compress_reader_page(reader, 1, 40, True, {})
+
+    class CountingPool(ThreadPoolExecutor):
+        mapped = 0
+
+        def map(self, fn, *iterables, **kwargs):
+            items = list(iterables[0])
+            CountingPool.mapped += len(items)
+            return super().map(fn, items, **kwargs)
+
+    with CountingPool(max_workers=2) as pool:
+        threaded = pdf_minimize._compress_reader_page(reader, 1, 40, True, {}, pool)
+
+    assert CountingPool.mapped == 2
+    assert len(serial) == 2
+    assert sorted(threaded) == sorted(serial)
+
+
+def test_reduce_pdf_size_failed_write_leaves_no_partial_output(tmp_path: Path, monkeypatch):
+    src = tmp_path / "src_images.pdf"
+    make_image_pdf(src, pages=1, size=(300, 300))
+
+    def broken_write(self, stream):
+        stream.write(b"%PDF-partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(PdfWriter, "write", broken_write)
+
+    fresh = tmp_path / "fresh.pdf"
+    with pytest.raises(OSError, match="disk full"):
+        reduce_pdf_size(str(src), str(fresh), reduction_percent=60, method="pypdf2")
+    assert not fresh.exists()
+    assert not (tmp_path / "fresh.pdf.tmp").exists()
+
+    existing = tmp_path / "existing.pdf"
+    existing.write_bytes(b"previous output")
+    with pytest.raises(OSError, match="disk full"):
+        reduce_pdf_size(str(src), str(existing), reduction_percent=60, method="pypdf2")
+    assert existing.read_bytes() == b"previous output"
+    assert not (tmp_path / "existing.pdf.tmp").exists()
+
+
+@pytest.mark.parametrize("cpus", [1, 4])
+def test_reduce_pdf_size_memory_mapped_input(tmp_path: Path, monkeypatch, cpus: int):
+    monkeypatch.setattr(_pdf_io, "MMAP_MIN_BYTES", 0)
+    mapped = []
+
+    def spy_mmap(*args, **kwargs):
+        mapped.append(args)
+        return mmap.mmap(*args, **kwargs)
+
+    monkeypatch.setattr(_pdf_io, "mmap", SimpleNamespace(mmap=spy_mmap, ACCESS_READ=mmap.ACCESS_READ))
+    monkeypatch.setattr(pdf_minimize.os, "cpu_count", lambda: cpus)
+    src = tmp_path / "src_images.pdf"
+    dst = tmp_path / "dst.pdf"
+    make_image_pdf(src, pages=2, size=(300, 300))
+
+    reduce_pdf_size(str(src), str(dst), reduction_percent=60, method="pypdf2", recompress_jpeg=True)
+    assert len(PdfReader(str(dst)).pages) == 2
+    assert os.path.getsize(dst) < os.path.getsize(src)
+    assert mapped
+
+
+def test_reduce_pdf_size_encodes_repeated_image_once(tmp_path: Path, monkeypatch):
+    src = tmp_path / "repeated.pdf"
+    dst = tmp_path / "dst.pdf"
+    img = Image.effect_noise((300, 300), 100.0).convert("RGB")
+    # Same pixels on both pages -> two image streams with identical bytes
+    img.save(src, format="PDF", save_all=True, append_images=[img.copy()])
+    monkeypatch.setattr(pdf_minimize.os, "cpu_count", lambda: 1)
+
+    calls = []
+    real_compress = pdf_minimize.compress_image
+
+    def counting_compress(data, quality):
+        calls.append(len(data))
+        return real_compress(data, quality)
+
+    monkeypatch.setattr(pdf_minimize, "compress_image", counting_compress)
+
+    reduce_pdf_size(str(src), str(dst), reduction_percent=60, method="pypdf2", recompress_jpeg=True)
+    assert len(calls) == 1
+    assert len(PdfReader(str(dst)).pages) == 2
+
+
 def test_reduce_pdf_size_selective_pages(tmp_path: Path):
     src = tmp_path / "src_images.pdf"
     dst = tmp_path / "dst.pdf"
@@ -73,7 +302,7 @@ def make_pdf(path: Path, pages: int = 7) -> None:
             writer.add_blank_page(width=595, height=842)  # A4-ish points
         else:
             writer.add_blank_page()
-    with open(path, "wb") as f:
+    with open(path, "wb", buffering=1 << 20) as f:
         writer.write(f)
 
 